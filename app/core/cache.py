@@ -0,0 +1,65 @@
+"""
+In-process response cache and ETags for address reads
+
+Every write bumps a version counter and empties the cache, so a cached
+body or ETag is never served after a change made through this process.
+Writes made by other processes (extra uvicorn workers, scripts) are not
+seen, which is why the cache is off unless RESPONSE_CACHE_SIZE is set.
+"""
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from app.core.config import settings
+
+
+class ResponseCache:
+    """LRU cache of serialized response bodies tied to a data version"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        # The boot token keeps ETags from a previous run from matching
+        self._boot_token = secrets.token_hex(4)
+        self._version = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._boot_token}-{self._version}"'
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached body for key, if any"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: Hashable, body: bytes, version: int) -> None:
+        """Cache body if no write happened since version was read"""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached bodies and change the ETag after a write"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
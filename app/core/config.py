@@ -1,6 +1,8 @@
 """
 Application configuration settings
 """
+import logging
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
@@ -15,6 +17,16 @@ class Settings(BaseSettings):
     
     # Database Settings
     DATABASE_URL: str = "sqlite:///./addresses.db"
+    # Connection pool (server databases only)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    # Bytes of the SQLite file to memory-map; 0 disables mmap
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+
+    # Cached read responses per process; 0 disables the cache and ETags.
+    # Only enable with a single worker process and no other database writers.
+    RESPONSE_CACHE_SIZE: int = 0
     
     # Logging Settings
     LOG_LEVEL: str = "INFO"
@@ -22,10 +34,15 @@ class Settings(BaseSettings):
     LOG_FILE: Optional[str] = "logs/app.log"
     LOG_MAX_BYTES: int = 10485760  # 10MB
     LOG_BACKUP_COUNT: int = 5
+    # Derived from LOG_LEVEL / LOG_FORMAT, resolved once at startup
+    LOG_LEVEL_INT: int = logging.INFO
+    LOG_FORMAT_NORM: str = "text"
     
     # Environment
     ENVIRONMENT: str = "development"  # development, staging, production
     DEBUG: bool = True
+    # Raise instead of lazy-loading relationships, to catch N+1 queries early
+    STRICT_LOADING: bool = False
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -33,5 +50,15 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+    @model_validator(mode="after")
+    def resolve_logging_settings(self) -> "Settings":
+        """Resolve the numeric log level and normalized log format"""
+        level = logging.getLevelName(self.LOG_LEVEL.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Invalid LOG_LEVEL: {self.LOG_LEVEL}")
+        self.LOG_LEVEL_INT = level
+        self.LOG_FORMAT_NORM = self.LOG_FORMAT.lower()
+        return self
+
 
 settings = Settings()
@@ -1,40 +1,74 @@
 """
 Comprehensive logging configuration for FastAPI application
 """
+import atexit
+import copy
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-import json
-from datetime import datetime
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import orjson
 
 from app.core.config import settings
 
 
+@lru_cache(maxsize=512)
+def _json_str(value: Optional[str]) -> str:
+    """JSON-encode a low-cardinality string (logger, module, function names)"""
+    return orjson.dumps(value).decode()
+
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
-    
+
+    def __init__(self):
+        super().__init__()
+        # Fixed leading keys, filled in per record without building a dict
+        self._prefix_tmpl = (
+            '{"timestamp":"%s","level":"%s","logger":%s,"message":%s,'
+            '"module":%s,"function":%s,"line":%d'
+        )
+        # Second-granularity ISO prefix, reused for every record in that second
+        self._cached_sec = -1
+        self._cached_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        """Format a UTC ISO-8601 timestamp with microseconds"""
+        sec = int(created)
+        if sec != self._cached_sec:
+            self._cached_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+            self._cached_sec = sec
+        return f"{self._cached_prefix}.{int((created - sec) * 1e6):06d}Z"
+
     def format(self, record: logging.LogRecord) -> str:
-        log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
-        
+        prefix = self._prefix_tmpl % (
+            self._timestamp(record.created),
+            record.levelname,
+            _json_str(record.name),
+            orjson.dumps(record.getMessage()).decode(),
+            _json_str(record.module),
+            _json_str(record.funcName),
+            record.lineno,
+        )
+
+        tail: Dict[str, Any] = {}
+
         # Add exception info if present
         if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
-        
+            tail["exception"] = self.formatException(record.exc_info)
+
         # Add extra fields if present
         if hasattr(record, "extra_fields"):
-            log_data.update(record.extra_fields)
-        
-        return json.dumps(log_data)
+            tail.update(record.extra_fields)
+
+        if not tail:
+            return prefix + "}"
+        return "".join((prefix, ",", orjson.dumps(tail).decode()[1:]))
 
 
 class TextFormatter(logging.Formatter):
@@ -47,10 +81,70 @@ class TextFormatter(logging.Formatter):
         )
 
 
+class FastRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that skips the filesystem checks on every record.
+
+    The stdlib implementation stats the log file on each emit; here that
+    only happens once the stream is close enough to ``maxBytes`` that a
+    rollover is actually possible.
+    """
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:  # delay was set...
+            self.stream = self._open()
+        msg = "%s\n" % self.format(record)
+        if self.stream.tell() + len(msg) < self.maxBytes:
+            return False
+        return super().shouldRollover(record)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the record (including any traceback)
+    before enqueueing it; here only the message arguments are merged so
+    the listener's formatters still see ``exc_info`` and extra fields.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Background listener that drives the real handlers
+_queue_listener: Optional[QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background logging thread, if one is running"""
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    for handler in _queue_listener.handlers:
+        handler.close()
+    _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+
 def setup_logging() -> None:
     """
-    Configure application logging with file and console handlers
+    Configure application logging with file and console handlers.
+
+    Records are enqueued by a QueueHandler on the root logger and written
+    out by a QueueListener thread, so request handlers never block on
+    console or file I/O.
     """
+    global _queue_listener
+
     # Create logs directory if it doesn't exist
     if settings.LOG_FILE:
         log_path = Path(settings.LOG_FILE)
@@ -58,13 +152,14 @@ def setup_logging() -> None:
     
     # Get root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    root_logger.setLevel(settings.LOG_LEVEL_INT)
     
-    # Clear existing handlers
+    # Clear existing handlers; a repeated call replaces the previous listener
     root_logger.handlers.clear()
+    _stop_queue_listener()
     
     # Choose formatter based on configuration
-    if settings.LOG_FORMAT.lower() == "json":
+    if settings.LOG_FORMAT_NORM == "json":
         formatter = JSONFormatter()
     else:
         formatter = TextFormatter()
@@ -74,11 +169,11 @@ def setup_logging() -> None:
     console_handler.setLevel(logging.INFO)
     console_text_formatter = TextFormatter()
     console_handler.setFormatter(console_text_formatter)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler with rotation
     if settings.LOG_FILE:
-        file_handler = RotatingFileHandler(
+        file_handler = FastRotatingFileHandler(
             settings.LOG_FILE,
             maxBytes=settings.LOG_MAX_BYTES,
             backupCount=settings.LOG_BACKUP_COUNT,
@@ -86,12 +181,22 @@ def setup_logging() -> None:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Route all records through a queue drained by a background thread
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
     
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
-    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    # Log SQL statements in development, routed through the queue like everything else
+    if settings.ENVIRONMENT == "development":
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    else:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     
     # Log initial configuration
     logger = logging.getLogger(__name__)
@@ -3,74 +3,89 @@ Custom middleware for request/response logging
 """
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
-    Middleware to log all HTTP requests and responses
+    Pure ASGI middleware to log all HTTP requests and responses
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and log details
         """
-        start_time = time.time()
-        
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+
         # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path}",
-            extra={
-                "extra_fields": {
-                    "method": request.method,
-                    "path": request.url.path,
-                    "query_params": str(request.query_params),
-                    "client_host": request.client.host if request.client else None,
-                    "user_agent": request.headers.get("user-agent"),
-                }
+        if logger.isEnabledFor(logging.INFO):
+            request_fields = {
+                "method": method,
+                "path": path,
+                "query_params": scope.get("query_string", b"").decode("latin-1"),
             }
-        )
-        
-        # Process request
-        try:
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log response
+            # Client and user-agent lookups are only worth the cost when debugging
+            if settings.LOG_LEVEL_INT <= logging.DEBUG:
+                client = scope.get("client")
+                request_fields["client_host"] = client[0] if client else None
+                request_fields["user_agent"] = Headers(scope=scope).get("user-agent")
             logger.info(
-                f"Response: {request.method} {request.url.path} - {response.status_code}",
-                extra={
-                    "extra_fields": {
-                        "method": request.method,
-                        "path": request.url.path,
-                        "status_code": response.status_code,
-                        "process_time": f"{process_time:.4f}s",
-                    }
-                }
+                "Request: %s %s", method, path,
+                extra={"extra_fields": request_fields}
             )
-            
-            # Add process time header
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+
+                # Log response
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Response: %s %s - %s", method, path, status_code,
+                        extra={
+                            "extra_fields": {
+                                "method": method,
+                                "path": path,
+                                "status_code": status_code,
+                                "process_time": f"{process_time:.4f}s",
+                            }
+                        }
+                    )
+
+                # Add process time header
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{process_time:.4f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
-            
+            process_time = time.perf_counter() - start_time
+
             logger.error(
-                f"Request failed: {request.method} {request.url.path}",
+                "Request failed: %s %s", method, path,
                 exc_info=True,
                 extra={
                     "extra_fields": {
-                        "method": request.method,
-                        "path": request.url.path,
+                        "method": method,
+                        "path": path,
                         "error": str(e),
                         "process_time": f"{process_time:.4f}s",
                     }
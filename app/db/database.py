@@ -2,22 +2,48 @@
 Database configuration and session management
 """
 from typing import Generator
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    engine_options = {"connect_args": {"check_same_thread": False}}
+else:
+    # Size the pool for concurrent FastAPI workers and drop stale connections
+    engine_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    echo=False,  # SQL logging is configured via the sqlalchemy.engine logger
+    **engine_options,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """Enable WAL so readers don't block behind writers, keep temp data in memory"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE:d}")
+        cursor.close()
+
+# Create session factory; objects stay loaded after commit so handlers can
+# serialize them without another SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
@@ -0,0 +1,155 @@
+"""
+Lightweight schema migrations for existing databases
+"""
+from typing import Tuple
+
+from sqlalchemy import Float, MetaData, Table, bindparam, inspect, insert, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.core.logging import get_logger
+from app.db.spatial import create_rtree_index
+from app.models import Address
+from app.utils import coordinate_columns, parse_coordinate
+
+logger = get_logger(__name__)
+
+
+def _parse_legacy_coordinates(latitude: str, longitude: str) -> Tuple[float, float]:
+    """Parse and range-check one legacy coordinate pair, raising ValueError"""
+    lat = parse_coordinate(latitude)
+    lon = parse_coordinate(longitude)
+    if not -90 <= lat <= 90:
+        raise ValueError(f"Latitude out of range: {latitude}")
+    if not -180 <= lon <= 180:
+        raise ValueError(f"Longitude out of range: {longitude}")
+    return lat, lon
+
+
+def migrate_coordinates_to_float(engine: Engine) -> None:
+    """
+    Convert legacy string latitude/longitude columns to floats.
+
+    Earlier versions stored coordinates as strings such as '22.705435° N'.
+    The table is rebuilt with the current schema and every value parsed
+    once. Rows whose coordinates cannot be parsed or are out of range are
+    not copied; the original table is then kept as ``addresses_legacy``
+    so they can be fixed by hand. Does nothing if the table is missing or
+    already numeric.
+    """
+    table_name = Address.__tablename__
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return
+
+    columns = {column["name"]: column["type"] for column in inspector.get_columns(table_name)}
+    if isinstance(columns["latitude"], Float) and isinstance(columns["longitude"], Float):
+        return
+
+    legacy_name = f"{table_name}_legacy"
+    if inspector.has_table(legacy_name):
+        raise RuntimeError(
+            f"Cannot migrate {table_name}: {legacy_name} already exists; "
+            "rename or drop it and restart"
+        )
+    logger.info("Migrating %s coordinates from strings to floats", table_name)
+
+    with engine.begin() as conn:
+        legacy = Table(table_name, MetaData(), autoload_with=conn)
+        rows = conn.execute(legacy.select()).mappings().all()
+
+        # Free the index names before the new table claims them
+        for index in legacy.indexes:
+            index.drop(conn)
+        conn.execute(text(f"ALTER TABLE {table_name} RENAME TO {legacy_name}"))
+        Address.__table__.create(conn)
+
+        migrated = []
+        for row in rows:
+            try:
+                latitude, longitude = _parse_legacy_coordinates(row["latitude"], row["longitude"])
+            except ValueError:
+                logger.warning(
+                    "Not migrating address %s with invalid coordinates: (%s, %s)",
+                    row["id"], row["latitude"], row["longitude"],
+                )
+                continue
+            migrated.append({
+                "id": row["id"],
+                "name": row["name"],
+                "latitude": latitude,
+                "longitude": longitude,
+                **coordinate_columns(latitude, longitude),
+            })
+        if migrated:
+            conn.execute(insert(Address.__table__), migrated)
+            if conn.dialect.name == "postgresql":
+                # Explicit ids do not advance the new SERIAL sequence
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"(SELECT MAX(id) FROM {table_name}))"
+                ))
+
+        skipped = len(rows) - len(migrated)
+        if not skipped:
+            conn.execute(text(f"DROP TABLE {legacy_name}"))
+
+    logger.info("Migrated %s of %s addresses", len(migrated), len(rows))
+    if skipped:
+        logger.error(
+            "%s addresses with invalid coordinates were not migrated; "
+            "the original rows are kept in %s",
+            skipped, legacy_name,
+        )
+
+
+def add_trig_columns(engine: Engine) -> None:
+    """Add and backfill the precomputed lat_rad/lon_rad/cos_lat columns"""
+    table_name = Address.__tablename__
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return
+
+    existing = {column["name"] for column in inspector.get_columns(table_name)}
+    missing = [name for name in ("lat_rad", "lon_rad", "cos_lat") if name not in existing]
+    if not missing:
+        return
+
+    logger.info("Adding precomputed coordinate columns to %s: %s", table_name, missing)
+    addresses = Address.__table__
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(
+                f"ALTER TABLE {table_name} ADD COLUMN {name} FLOAT NOT NULL DEFAULT 0"
+            ))
+        rows = conn.execute(
+            select(addresses.c.id, addresses.c.latitude, addresses.c.longitude)
+        ).all()
+        if rows:
+            conn.execute(
+                update(addresses)
+                .where(addresses.c.id == bindparam("row_id"))
+                .values(
+                    lat_rad=bindparam("lat_rad"),
+                    lon_rad=bindparam("lon_rad"),
+                    cos_lat=bindparam("cos_lat"),
+                ),
+                [
+                    {"row_id": row.id, **coordinate_columns(row.latitude, row.longitude)}
+                    for row in rows
+                ],
+            )
+
+
+def ensure_spatial_index(engine: Engine) -> None:
+    """Add the SQLite R-Tree index to an existing addresses table"""
+    if engine.dialect.name != "sqlite" or not inspect(engine).has_table(Address.__tablename__):
+        return
+    with engine.begin() as conn:
+        create_rtree_index(conn)
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring an existing database up to the current schema"""
+    migrate_coordinates_to_float(engine)
+    add_trig_columns(engine)
+    ensure_spatial_index(engine)
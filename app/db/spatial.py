@@ -0,0 +1,55 @@
+"""
+SQLite R-Tree spatial index for address coordinates
+
+The ``rtree_addresses`` virtual table mirrors each address as a
+zero-size box and is kept in sync by triggers, so a bounding-box search
+is an R-Tree lookup instead of a table scan. Requires SQLite built with
+R-Tree support (the default for CPython's bundled SQLite).
+"""
+from sqlalchemy import column, table, text
+from sqlalchemy.engine import Connection
+
+RTREE_TABLE = "rtree_addresses"
+
+# Lightweight table construct for querying the virtual table
+rtree_addresses = table(
+    RTREE_TABLE,
+    column("id"),
+    column("minLat"),
+    column("maxLat"),
+    column("minLon"),
+    column("maxLon"),
+)
+
+_CREATE_STATEMENTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} "
+    "USING rtree(id, minLat, maxLat, minLon, maxLon)",
+
+    "CREATE TRIGGER IF NOT EXISTS addresses_rtree_insert AFTER INSERT ON addresses BEGIN "
+    f"INSERT INTO {RTREE_TABLE} VALUES "
+    "(new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+
+    "CREATE TRIGGER IF NOT EXISTS addresses_rtree_update "
+    "AFTER UPDATE OF latitude, longitude ON addresses BEGIN "
+    f"UPDATE {RTREE_TABLE} SET minLat = new.latitude, maxLat = new.latitude, "
+    "minLon = new.longitude, maxLon = new.longitude WHERE id = new.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS addresses_rtree_delete AFTER DELETE ON addresses BEGIN "
+    f"DELETE FROM {RTREE_TABLE} WHERE id = old.id; END",
+
+    # Backfill rows written before the index existed
+    f"INSERT INTO {RTREE_TABLE} "
+    "SELECT id, latitude, latitude, longitude, longitude FROM addresses "
+    f"WHERE id NOT IN (SELECT id FROM {RTREE_TABLE})",
+)
+
+
+def create_rtree_index(connection: Connection) -> None:
+    """Create (or complete) the R-Tree index and its sync triggers"""
+    for statement in _CREATE_STATEMENTS:
+        connection.execute(text(statement))
+
+
+def drop_rtree_index(connection: Connection) -> None:
+    """Drop the R-Tree index (its triggers go with the addresses table)"""
+    connection.execute(text(f"DROP TABLE IF EXISTS {RTREE_TABLE}"))
@@ -1,20 +1,31 @@
 """
 FastAPI application entry point
 """
-from fastapi import FastAPI
+import math
+from typing import Any
+
+import anyio.to_thread
+from fastapi import FastAPI, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
 from app.core.middleware import LoggingMiddleware
 from app.db import engine, Base
+from app.db.database import IS_SQLITE
+from app.db.migrations import run_migrations
 from app.routers import api_router
 
 # Setup logging first
 setup_logging()
 logger = get_logger(__name__)
 
-# Create database tables
+# Migrate existing tables and create any missing ones
+run_migrations(engine)
 logger.info("Creating database tables...")
 Base.metadata.create_all(bind=engine)
 logger.info("Database tables created successfully")
@@ -45,10 +56,53 @@ app.add_middleware(LoggingMiddleware)
 app.include_router(api_router)
 
 
+# Database errors are logged once here instead of in every service/router
+@app.exception_handler(SQLAlchemyError)
+async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError) -> JSONResponse:
+    """Translate database errors into a 500 response"""
+    logger.error(
+        "Database error: %s %s", request.method, request.url.path,
+        exc_info=exc,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Internal database error"},
+    )
+
+
+def _json_safe(value: Any) -> Any:
+    """Replace non-finite floats, which JSON cannot represent, with strings"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+# Same body as FastAPI's default handler, but rejected inputs such as
+# Infinity/NaN coordinates are echoed back without breaking serialization
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    """Return validation errors as a 422 response"""
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        content={"detail": _json_safe(jsonable_encoder(exc.errors()))},
+    )
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Application startup event"""
+    # Sync endpoints run on AnyIO worker threads (40 by default). Allow one per
+    # pooled connection so bursts queue on the pool instead of on threads.
+    if not IS_SQLITE:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = max(
+            limiter.total_tokens, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        )
     logger.info(
         f"Starting {settings.PROJECT_NAME} v{settings.VERSION}",
         extra={
@@ -1,8 +1,9 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Float, Index, Integer, String, event
 from app.db import Base
+from app.db.spatial import create_rtree_index, drop_rtree_index
 
 
 class Address(Base):
@@ -11,8 +12,30 @@ class Address(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    latitude = Column(String, nullable=False)
-    longitude = Column(String, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    # Precomputed from latitude/longitude so distance scans skip the trig
+    lat_rad = Column(Float, nullable=False)
+    lon_rad = Column(Float, nullable=False)
+    cos_lat = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_addr_lat_lon", "latitude", "longitude"),
+    )
     
     def __repr__(self):
         return f"<Address(id={self.id}, name='{self.name}')>"
+
+
+@event.listens_for(Address.__table__, "after_create")
+def _create_spatial_index(target, connection, **kw):
+    """Create the R-Tree index alongside the table on SQLite"""
+    if connection.dialect.name == "sqlite":
+        create_rtree_index(connection)
+
+
+@event.listens_for(Address.__table__, "after_drop")
+def _drop_spatial_index(target, connection, **kw):
+    """Drop the R-Tree index with the table on SQLite"""
+    if connection.dialect.name == "sqlite":
+        drop_rtree_index(connection)
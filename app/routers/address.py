@@ -1,12 +1,16 @@
 """
 Address router - HTTP layer only
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Callable, Hashable, List, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache
 from app.db import get_db
-from app.schemas import AddressCreate, AddressUpdate, AddressResponse
+from app.schemas import AddressCreate, AddressUpdate, AddressResponse, AddressDeleteResponse
 from app.services.address_service import AddressService
 from app.core.logging import get_logger
 
@@ -14,6 +18,30 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/addresses", tags=["addresses"])
 
+_ADDRESS_LIST_JSON = TypeAdapter(List[AddressResponse])
+
+
+def _json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Wrap already-serialized JSON, skipping response_model re-validation"""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cached_response(request: Request, key: Hashable, load: Callable[[], bytes]) -> Response:
+    """Serve an address list from the response cache, with ETag revalidation"""
+    # Read before loading so a concurrent write can only make the ETag stale
+    version = response_cache.version
+    etag = response_cache.etag
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = response_cache.get(key)
+    if body is None:
+        body = load()
+        response_cache.set(key, body, version)
+    return _json_response(body, headers)
+
 
 @router.post(
     "",
@@ -34,16 +62,28 @@ def create_address(
     - **longitude**: Longitude coordinate
     """
     logger.info(f"POST /addresses - Creating address: {address.name}")
-    try:
-        result = AddressService.create_address(db, address)
-        logger.info(f"Address created successfully with ID: {result.id}")
-        return result
-    except Exception as e:
-        logger.error(f"Error creating address: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create address"
-        )
+    return AddressService.create_address(db, address)
+
+
+@router.post(
+    "/bulk",
+    response_model=List[AddressResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create addresses in bulk",
+    description="Add many addresses in a single transaction"
+)
+def bulk_create_addresses(
+    addresses: List[AddressCreate],
+    db: Session = Depends(get_db)
+) -> List[AddressResponse]:
+    """
+    Create many addresses at once
+
+    - **addresses**: List of addresses, each with name, latitude and longitude
+    """
+    logger.info(f"POST /addresses/bulk - Creating {len(addresses)} addresses")
+    created = AddressService.bulk_create_addresses(db, addresses)
+    return [AddressResponse.model_validate(address) for address in created]
 
 
 @router.get(
@@ -53,10 +93,11 @@ def create_address(
     description="Retrieve all addresses with optional pagination"
 )
 def list_addresses(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
-) -> List[AddressResponse]:
+) -> Response:
     """
     Get all addresses
     
@@ -64,58 +105,65 @@ def list_addresses(
     - **limit**: Maximum number of records to return (default: 100)
     """
     logger.info(f"GET /addresses - Fetching addresses (skip={skip}, limit={limit})")
-    try:
+
+    def load() -> bytes:
         addresses = AddressService.get_all_addresses(db, skip=skip, limit=limit)
-        return addresses
-    except Exception as e:
-        logger.error(f"Error fetching addresses: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch addresses"
+        return _ADDRESS_LIST_JSON.dump_json(
+            [AddressResponse.model_validate(address) for address in addresses]
         )
 
+    if response_cache.enabled:
+        return _cached_response(request, ("list", skip, limit), load)
+    return _json_response(load())
+
 
 @router.get(
     "/nearby",
     response_model=List[AddressResponse],
     summary="Find nearby addresses",
-    description="Find all addresses within a specified radius from given coordinates"
+    description="Find all addresses within a specified radius from given coordinates, nearest first"
 )
 def find_nearby_addresses(
+    request: Request,
     latitude: str,
     longitude: str,
     distance_km: float,
+    limit: Optional[int] = Query(None, ge=1, description="Return only the nearest N addresses"),
     db: Session = Depends(get_db)
-) -> List[AddressResponse]:
+) -> Response:
     """
     Find nearby addresses
     
     - **latitude**: Center point latitude
     - **longitude**: Center point longitude
     - **distance_km**: Radius in kilometers
+    - **limit**: (Optional) Maximum number of addresses to return
     """
     logger.info(
         f"GET /addresses/nearby - Searching within {distance_km}km of ({latitude}, {longitude})"
     )
     
-    try:
+    def load() -> bytes:
         addresses = AddressService.find_nearby_addresses(
-            db, latitude, longitude, distance_km
+            db, latitude, longitude, distance_km, limit
         )
         logger.info(f"Found {len(addresses)} nearby addresses")
-        return addresses
+        # Plain dicts of typed columns: orjson needs no model round-trip
+        return orjson.dumps(addresses)
+
+    try:
+        if response_cache.enabled:
+            # Reject bad input before a matching ETag can turn it into a 304
+            AddressService.validate_nearby_params(latitude, longitude, distance_km, limit)
+            key = ("nearby", latitude, longitude, distance_km, limit)
+            return _cached_response(request, key, load)
+        return _json_response(load())
     except ValueError as e:
         logger.error(f"Invalid input: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except Exception as e:
-        logger.error(f"Error searching nearby addresses: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to search nearby addresses"
-        )
 
 
 @router.get(
@@ -164,28 +212,20 @@ def update_address(
     - **longitude**: (Optional) Updated longitude
     """
     logger.info(f"PUT /addresses/{address_id} - Updating address")
-    try:
-        result = AddressService.update_address(db, address_id, address)
-        if not result:
-            logger.warning(f"Address with ID {address_id} not found for update")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Address with ID {address_id} not found"
-            )
-        logger.info(f"Address {address_id} updated successfully")
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating address: {e}", exc_info=True)
+    result = AddressService.update_address(db, address_id, address)
+    if result is None:
+        logger.warning(f"Address with ID {address_id} not found for update")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update address"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Address with ID {address_id} not found"
         )
+    logger.info(f"Address {address_id} updated successfully")
+    return result
 
 
 @router.delete(
     "/{address_id}",
+    response_model=AddressDeleteResponse,
     status_code=status.HTTP_200_OK,
     summary="Delete an address",
     description="Delete an address by its ID"
@@ -193,28 +233,19 @@ def update_address(
 def delete_address(
     address_id: int,
     db: Session = Depends(get_db)
-) -> dict:
+) -> AddressDeleteResponse:
     """
     Delete an address
     
     - **address_id**: The ID of the address to delete
     """
     logger.info(f"DELETE /addresses/{address_id} - Deleting address")
-    try:
-        result = AddressService.delete_address(db, address_id)
-        if not result:
-            logger.warning(f"Address with ID {address_id} not found for deletion")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Address with ID {address_id} not found"
-            )
-        logger.info(f"Address {address_id} deleted successfully")
-        return {"message": "Address deleted successfully", "id": address_id}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting address: {e}", exc_info=True)
+    result = AddressService.delete_address(db, address_id)
+    if result is None:
+        logger.warning(f"Address with ID {address_id} not found for deletion")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete address"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Address with ID {address_id} not found"
         )
+    logger.info(f"Address {address_id} deleted successfully")
+    return AddressDeleteResponse(message="Address deleted successfully", id=address_id)
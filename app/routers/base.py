@@ -1,18 +1,32 @@
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Settings are fixed after startup, so these bodies are serialized once
+_ROOT_BYTES = orjson.dumps({
+    "message": "Welcome to Address Book API",
+    "version": settings.VERSION,
+    "docs": "/docs",
+    "redoc": "/redoc"
+})
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": settings.VERSION,
+    "environment": settings.ENVIRONMENT
+})
+
+
 @router.get("/", tags=["root"])
-def root():
+async def root() -> Response:
     """Root endpoint"""
-    return {
-        "message": "Welcome to Address Book API",
-        "version": settings.VERSION,
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
+@router.get("/health", tags=["root"])
+async def health_check() -> Response:
+    """Health check endpoint for load balancers and uptime probes"""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
@@ -1 +1 @@
-from .address import AddressCreate, AddressUpdate, AddressResponse
+from .address import AddressCreate, AddressUpdate, AddressResponse, AddressDeleteResponse
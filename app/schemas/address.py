@@ -1,56 +1,112 @@
 """
 Pydantic schemas for request/response validation
 """
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Any, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.utils import parse_coordinate
+
+
+# Schemas are immutable and reject unknown fields; no per-assignment
+# validation or whitespace stripping is needed
+_BASE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="forbid",
+    str_strip_whitespace=False,
+    validate_assignment=False,
+    arbitrary_types_allowed=False,
+)
+
+
+def _parse_coordinate_field(value: Any) -> Any:
+    """Convert coordinate strings like '22.705435° N' to decimal degrees"""
+    if isinstance(value, str):
+        return parse_coordinate(value)
+    return value
 
 
 class AddressCreate(BaseModel):
     """Schema for creating an address"""
     name: str = Field(..., description="Name of the address", min_length=1)
-    latitude: str = Field(..., description="Latitude coordinate")
-    longitude: str = Field(..., description="Longitude coordinate")
+    latitude: float = Field(..., description="Latitude coordinate", ge=-90, le=90, allow_inf_nan=False)
+    longitude: float = Field(..., description="Longitude coordinate", ge=-180, le=180, allow_inf_nan=False)
+
+    @field_validator("latitude", "longitude", mode="before")
+    @classmethod
+    def parse_coordinates(cls, value: Any) -> Any:
+        return _parse_coordinate_field(value)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **_BASE_CONFIG,
+        json_schema_extra={
             "example": {
                 "name": "Home",
                 "latitude": "22.705435° N",
                 "longitude": "75.84361° E"
             }
         }
+    )
 
 
 class AddressUpdate(BaseModel):
     """Schema for updating an address"""
     name: Optional[str] = Field(None, description="Name of the address", min_length=1)
-    latitude: Optional[str] = Field(None, description="Latitude coordinate")
-    longitude: Optional[str] = Field(None, description="Longitude coordinate")
+    latitude: Optional[float] = Field(
+        None, description="Latitude coordinate", ge=-90, le=90, allow_inf_nan=False
+    )
+    longitude: Optional[float] = Field(
+        None, description="Longitude coordinate", ge=-180, le=180, allow_inf_nan=False
+    )
 
-    class Config:
-        json_schema_extra = {
+    @field_validator("latitude", "longitude", mode="before")
+    @classmethod
+    def parse_coordinates(cls, value: Any) -> Any:
+        return _parse_coordinate_field(value)
+
+    model_config = ConfigDict(
+        **_BASE_CONFIG,
+        json_schema_extra={
             "example": {
                 "name": "Updated Home",
                 "latitude": "22.705435° N",
                 "longitude": "75.84361° E"
             }
         }
+    )
 
 
 class AddressResponse(BaseModel):
     """Schema for address response"""
     id: int
     name: str
-    latitude: str
-    longitude: str
+    latitude: float
+    longitude: float
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **_BASE_CONFIG,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "name": "Home",
-                "latitude": "22.705435° N",
-                "longitude": "75.84361° E"
+                "latitude": 22.705435,
+                "longitude": 75.84361
+            }
+        }
+    )
+
+
+class AddressDeleteResponse(BaseModel):
+    """Schema for address deletion response"""
+    message: str
+    id: int
+
+    model_config = ConfigDict(
+        **_BASE_CONFIG,
+        json_schema_extra={
+            "example": {
+                "message": "Address deleted successfully",
+                "id": 1
             }
         }
+    )
@@ -1,16 +1,49 @@
 """
 Address business logic service and data access
 """
-from typing import Optional, List, Union
-from sqlalchemy.orm import Session
+import logging
+import math
+from operator import itemgetter
+from typing import Any, Dict, Optional, List, Tuple, Union
 
+import numpy as np
+from pydantic import TypeAdapter
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, raiseload
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.db.spatial import rtree_addresses
 from app.models import Address
 from app.schemas import AddressCreate, AddressUpdate
-from app.utils import haversine
+from app.utils import (
+    bounding_box,
+    coordinate_columns,
+    haversine_terms_rad,
+    max_haversine_term,
+    parse_coordinate,
+)
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Dumps a whole batch in one pydantic-core call instead of model_dump per item
+_ADDRESS_LIST = TypeAdapter(List[AddressCreate])
+
+# Both nearby queries select these columns first, in this order, and
+# _response_dict reads them back by position
+_RESPONSE_COLUMNS = (Address.id, Address.name, Address.latitude, Address.longitude)
+
+
+def _response_dict(row: Any) -> Dict[str, Any]:
+    """AddressResponse-shaped dict from a row that starts with _RESPONSE_COLUMNS"""
+    return {"id": row[0], "name": row[1], "latitude": row[2], "longitude": row[3]}
+
+
+def _load_options() -> list:
+    """Loader options for ORM reads; list eager loads for new relationships here"""
+    return [raiseload("*")] if settings.STRICT_LOADING else []
+
 
 class AddressService:
     """Service layer for address management"""
@@ -18,105 +51,221 @@ class AddressService:
     @staticmethod
     def create_address(db: Session, address_data: AddressCreate) -> Address:
         """Create a new address"""
-        logger.info(f"Creating new address: {address_data.name}")
-        try:
-            db_address = Address(**address_data.model_dump())
-            db.add(db_address)
-            db.commit()
-            db.refresh(db_address)
-            logger.info(f"Address created successfully with ID: {db_address.id}")
-            return db_address
-        except Exception as e:
-            logger.error(f"Error creating address: {e}", exc_info=True)
-            db.rollback()
-            raise
+        logger.info("Creating new address: %s", address_data.name)
+        data = address_data.model_dump()
+        db_address = Address(**data, **coordinate_columns(data["latitude"], data["longitude"]))
+        db.add(db_address)
+        db.commit()
+        response_cache.invalidate()
+        logger.info("Address created successfully with ID: %s", db_address.id)
+        return db_address
+
+    @staticmethod
+    def bulk_create_addresses(db: Session, addresses_data: List[AddressCreate]) -> List[Address]:
+        """Create many addresses with one INSERT and one commit"""
+        logger.info("Creating %s addresses in bulk", len(addresses_data))
+        if not addresses_data:
+            return []
+        rows = _ADDRESS_LIST.dump_python(addresses_data)
+        for data in rows:
+            data.update(coordinate_columns(data["latitude"], data["longitude"]))
+        db_addresses = db.scalars(
+            insert(Address).returning(Address, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        db.commit()
+        response_cache.invalidate()
+        logger.info("Created %s addresses", len(db_addresses))
+        return db_addresses
 
     @staticmethod
     def get_address(db: Session, address_id: int) -> Optional[Address]:
         """Get an address by ID"""
-        logger.debug(f"Fetching address with ID: {address_id}")
-        return db.query(Address).filter(Address.id == address_id).first()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Fetching address with ID: %s", address_id)
+        return db.get(Address, address_id, options=_load_options())
 
     @staticmethod
     def get_all_addresses(db: Session, skip: int = 0, limit: int = 100) -> List[Address]:
         """Get all addresses with pagination"""
-        logger.debug(f"Fetching addresses (skip={skip}, limit={limit})")
-        return db.query(Address).offset(skip).limit(limit).all()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Fetching addresses (skip=%s, limit=%s)", skip, limit)
+        return db.scalars(
+            select(Address).options(*_load_options()).offset(skip).limit(limit)
+        ).all()
 
     @staticmethod
     def update_address(db: Session, address_id: int, address_data: AddressUpdate) -> Optional[Address]:
         """Update an address"""
-        logger.info(f"Updating address with ID: {address_id}")
-        db_address = db.query(Address).filter(Address.id == address_id).first()
-        
+        logger.info("Updating address with ID: %s", address_id)
+        update_data = address_data.model_dump(exclude_unset=True)
+        if not update_data:
+            # Nothing to write; an empty UPDATE is invalid SQL
+            db_address = db.get(Address, address_id, options=_load_options())
+        else:
+            update_data.update(
+                coordinate_columns(update_data.get("latitude"), update_data.get("longitude"))
+            )
+            # Single UPDATE ... RETURNING instead of SELECT then UPDATE
+            db_address = db.scalars(
+                update(Address)
+                .where(Address.id == address_id)
+                .values(**update_data)
+                .returning(Address)
+            ).one_or_none()
+            db.commit()
+            response_cache.invalidate()
+
         if not db_address:
-            logger.warning(f"Address with ID {address_id} not found for update")
+            logger.warning("Address with ID %s not found for update", address_id)
             return None
-        
-        try:
-            update_data = address_data.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_address, key, value)
-            
-            db.commit()
-            db.refresh(db_address)
-            logger.info(f"Address {address_id} updated successfully")
-            return db_address
-        except Exception as e:
-            logger.error(f"Error updating address {address_id}: {e}", exc_info=True)
-            db.rollback()
-            raise
+
+        logger.info("Address %s updated successfully", address_id)
+        return db_address
 
     @staticmethod
-    def delete_address(db: Session, address_id: int) -> Optional[Address]:
-        """Delete an address"""
-        logger.info(f"Deleting address with ID: {address_id}")
-        db_address = db.query(Address).filter(Address.id == address_id).first()
-        
-        if not db_address:
-            logger.warning(f"Address with ID {address_id} not found for deletion")
+    def delete_address(db: Session, address_id: int) -> Optional[int]:
+        """Delete an address, returning its ID or None if it did not exist"""
+        logger.info("Deleting address with ID: %s", address_id)
+        deleted_id = db.scalars(
+            delete(Address).where(Address.id == address_id).returning(Address.id)
+        ).one_or_none()
+        db.commit()
+        response_cache.invalidate()
+
+        if deleted_id is None:
+            logger.warning("Address with ID %s not found for deletion", address_id)
             return None
-        
-        try:
-            db.delete(db_address)
-            db.commit()
-            logger.info(f"Address {address_id} deleted successfully")
-            return db_address
-        except Exception as e:
-            logger.error(f"Error deleting address {address_id}: {e}", exc_info=True)
-            db.rollback()
-            raise
+
+        logger.info("Address %s deleted successfully", address_id)
+        return deleted_id
+
+    @staticmethod
+    def validate_nearby_params(
+        latitude: Union[str, float],
+        longitude: Union[str, float],
+        distance_km: float,
+        limit: Optional[int] = None
+    ) -> Tuple[float, float]:
+        """Check nearby-search parameters and return the parsed centre, raising ValueError"""
+        # Written so that NaN, which fails every comparison, is rejected too
+        if not distance_km > 0:
+            raise ValueError("distance_km must be greater than 0")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        center_lat = parse_coordinate(latitude)
+        center_lon = parse_coordinate(longitude)
+        if not -90 <= center_lat <= 90:
+            raise ValueError("Latitude must be between -90 and 90 degrees")
+        if not -180 <= center_lon <= 180:
+            raise ValueError("Longitude must be between -180 and 180 degrees")
+        return center_lat, center_lon
 
     @staticmethod
     def find_nearby_addresses(
         db: Session,
         latitude: Union[str, float],
         longitude: Union[str, float],
-        distance_km: float
-    ) -> List[Address]:
-        """Find nearby addresses within a specified radius"""
-        logger.info(f"Finding addresses within {distance_km}km of ({latitude}, {longitude})")
+        distance_km: float,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Find nearby addresses within a specified radius, nearest first"""
+        logger.info("Finding addresses within %skm of (%s, %s)", distance_km, latitude, longitude)
         
-        if distance_km <= 0:
-            raise ValueError("distance_km must be greater than 0")
-        
-        try:
-            addresses = db.query(Address).all()
-            nearby_with_dist = []
-            
-            for addr in addresses:
-                try:
-                    dist = haversine(latitude, longitude, addr.latitude, addr.longitude)
-                    if 0 <= dist <= distance_km:
-                        nearby_with_dist.append((addr, dist))
-                except Exception as e:
-                    logger.warning(f"Error calculating distance for address {addr.id}: {e}")
-                    continue
-            
-            # Sort by distance
-            nearby_with_dist.sort(key=lambda x: x[1])
-            return [item[0] for item in nearby_with_dist]
-            
-        except Exception as e:
-            logger.error(f"Error searching nearby addresses: {e}", exc_info=True)
-            raise
+        center_lat, center_lon = AddressService.validate_nearby_params(
+            latitude, longitude, distance_km, limit
+        )
+
+        box = bounding_box(center_lat, center_lon, distance_km)
+        if db.get_bind().dialect.name == "sqlite":
+            return AddressService._find_nearby_rtree(
+                db, center_lat, center_lon, distance_km, box, limit
+            )
+        return AddressService._find_nearby_sql(db, center_lat, center_lon, distance_km, box, limit)
+
+    @staticmethod
+    def _find_nearby_rtree(
+        db: Session,
+        center_lat: float,
+        center_lon: float,
+        distance_km: float,
+        box: Tuple[float, float, float, float],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """SQLite: R-Tree bounding-box lookup, exact radius test in NumPy"""
+        min_lat, max_lat, min_lon, max_lon = box
+        # Plain column tuples: no ORM identity-map or instrumentation cost per row
+        stmt = select(
+            *_RESPONSE_COLUMNS, Address.lat_rad, Address.lon_rad, Address.cos_lat,
+        ).join(
+            rtree_addresses, rtree_addresses.c.id == Address.id
+        ).where(
+            # R-Tree boxes are rounded outwards to float32, so test for overlap
+            rtree_addresses.c.maxLat >= min_lat,
+            rtree_addresses.c.minLat <= max_lat,
+            rtree_addresses.c.maxLon >= min_lon,
+            rtree_addresses.c.minLon <= max_lon,
+        )
+
+        rows = db.execute(stmt).all()
+        if not rows:
+            return []
+
+        # Positional itemgetter access is several times faster than Row attributes
+        count = len(rows)
+        lats_rad, lons_rad, cos_lats = (
+            np.fromiter(map(itemgetter(column), rows), dtype=np.float64, count=count)
+            for column in range(len(_RESPONSE_COLUMNS), len(_RESPONSE_COLUMNS) + 3)
+        )
+        # The haversine term orders points like the distance does, so filter and
+        # rank on it and never take the sqrt/asin
+        terms = haversine_terms_rad(center_lat, center_lon, lats_rad, lons_rad, cos_lats)
+        within = np.flatnonzero(terms <= max_haversine_term(distance_km))
+        if limit is not None and limit < within.size:
+            # Select the k nearest in O(n), then sort only those. argpartition
+            # picks arbitrary elements among ties at the k-th term, so take
+            # everything strictly nearer plus the lowest-index ties: exactly
+            # the first k entries of the full stable sort.
+            within_terms = terms[within]
+            kth_term = np.partition(within_terms, limit - 1)[limit - 1]
+            nearer = np.flatnonzero(within_terms < kth_term)
+            ties = np.flatnonzero(within_terms == kth_term)[:limit - nearer.size]
+            within = within[np.sort(np.concatenate((nearer, ties)))]
+
+        # Sort by distance
+        order = within[np.argsort(terms[within], kind="stable")]
+        return [_response_dict(rows[i]) for i in order]
+
+    @staticmethod
+    def _find_nearby_sql(
+        db: Session,
+        center_lat: float,
+        center_lon: float,
+        distance_km: float,
+        box: Tuple[float, float, float, float],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Server databases: bounding box, exact Haversine and ordering all in SQL"""
+        min_lat, max_lat, min_lon, max_lon = box
+        lat0_rad = math.radians(center_lat)
+        lon0_rad = math.radians(center_lon)
+
+        a = func.pow(func.sin((Address.lat_rad - lat0_rad) * 0.5), 2) + \
+            math.cos(lat0_rad) * Address.cos_lat * \
+            func.pow(func.sin((Address.lon_rad - lon0_rad) * 0.5), 2)
+
+        # The index-friendly box prefilter runs before the exact test. The
+        # haversine term orders points like the distance, so no sqrt/asin.
+        candidates = select(*_RESPONSE_COLUMNS, a.label("term")).where(
+            Address.latitude.between(min_lat, max_lat),
+            Address.longitude.between(min_lon, max_lon),
+        ).subquery()
+
+        rows = db.execute(
+            select(*(candidates.c[column.key] for column in _RESPONSE_COLUMNS))
+            .where(candidates.c.term <= max_haversine_term(distance_km))
+            .order_by(candidates.c.term, candidates.c.id)
+            .limit(limit)
+        ).all()
+        return [_response_dict(row) for row in rows]
@@ -0,0 +1,238 @@
+"""
+Utility functions
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+try:
+    from app.utils._haversine_numba import haversine_terms_many
+except ImportError:  # Numba is optional; fall back to NumPy
+    haversine_terms_many = None
+
+# Below this many points thread start-up outweighs the compiled kernel's gain
+NUMBA_MIN_POINTS = 10_000
+
+
+# Numeric value with an optional degree sign and compass direction
+_COORD_RE = re.compile(r"([-+]?\d*\.?\d+)\s*°?\s*([NSEW])?", re.IGNORECASE)
+
+
+def parse_coordinate(coord: Union[str, float, int]) -> float:
+    """
+    Parse coordinate string like '22.705435° N' or '75.84361° E' to float.
+    
+    Args:
+        coord: Coordinate string or numeric value
+        
+    Returns:
+        Parsed coordinate as float
+    """
+    if isinstance(coord, (int, float)):
+        return float(coord)
+    
+    return _parse_coord_str(str(coord))
+
+
+# Clients tend to resend the same few coordinates (offices, branches), so a
+# repeat costs one dict lookup. Failures raise and so are never cached.
+@lru_cache(maxsize=4096)
+def _parse_coord_str(coord_str: str) -> float:
+    """Parse a coordinate string such as '22.705435' or '22.705435° N'"""
+    # Plain numeric strings skip the regex entirely
+    try:
+        return float(coord_str)
+    except ValueError:
+        pass
+    
+    # Extract numeric value and direction
+    match = _COORD_RE.match(coord_str.strip())
+    
+    if match:
+        value = float(match.group(1))
+        
+        # Apply negative sign for South and West
+        if match.group(2) in ('S', 's', 'W', 'w'):
+            value = -value
+        
+        return value
+    
+    logger.error("Failed to parse coordinate: %s", coord_str)
+    raise ValueError(f"Invalid coordinate format: {coord_str}")
+
+
+def haversine(lat1: Union[str, float], lon1: Union[str, float], lat2: Union[str, float], lon2: Union[str, float]) -> float:
+    """
+    Calculate distance between two points using Haversine formula.
+    
+    Args:
+        lat1: Latitude of first point
+        lon1: Longitude of first point
+        lat2: Latitude of second point
+        lon2: Longitude of second point
+        
+    Returns:
+        Distance in kilometers
+    """
+    try:
+        # Parse coordinates if they are strings
+        lat1_parsed = parse_coordinate(lat1)
+        lon1_parsed = parse_coordinate(lon1)
+        lat2_parsed = parse_coordinate(lat2)
+        lon2_parsed = parse_coordinate(lon2)
+        
+        # Validate coordinate ranges
+        if not (-90 <= lat1_parsed <= 90) or not (-90 <= lat2_parsed <= 90):
+            raise ValueError("Latitude must be between -90 and 90 degrees")
+        if not (-180 <= lon1_parsed <= 180) or not (-180 <= lon2_parsed <= 180):
+            raise ValueError("Longitude must be between -180 and 180 degrees")
+        
+        # Convert each latitude once and reuse it for the difference and cosine
+        lat1_rad = math.radians(lat1_parsed)
+        lat2_rad = math.radians(lat2_parsed)
+        half_d_lat = (lat2_rad - lat1_rad) * 0.5
+        half_d_lon = math.radians(lon2_parsed - lon1_parsed) * 0.5
+
+        a = math.sin(half_d_lat)**2 + \
+            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(half_d_lon)**2
+
+        # 2*asin(sqrt(a)) equals 2*atan2(sqrt(a), sqrt(1-a)) with one fewer
+        # sqrt; clamp a against rounding just above 1 for antipodal points
+        return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+        
+    except Exception as e:
+        logger.error("Error calculating haversine distance: %s", e, exc_info=True)
+        raise
+
+
+def bounding_box(latitude: float, longitude: float, distance_km: float) -> Tuple[float, float, float, float]:
+    """
+    Compute a latitude/longitude box containing every point within a radius.
+
+    The box is exact for a sphere (it accounts for meridians converging),
+    so it can be used as a cheap prefilter before the Haversine check.
+    When the circle reaches a pole or crosses the antimeridian the full
+    longitude range is returned.
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        distance_km: Radius in kilometers
+
+    Returns:
+        Tuple of (min_lat, max_lat, min_lon, max_lon) in degrees
+    """
+    angular = distance_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(angular)
+    min_lat = latitude - d_lat
+    max_lat = latitude + d_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    d_lon = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(latitude))))
+    min_lon = longitude - d_lon
+    max_lon = longitude + d_lon
+
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def coordinate_columns(latitude: Optional[float] = None, longitude: Optional[float] = None) -> Dict[str, float]:
+    """
+    Precompute the trigonometric values stored alongside a coordinate.
+
+    Only values derived from the coordinates given are returned, so the
+    result can be merged into a partial update.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+
+    Returns:
+        Dict with ``lat_rad``/``cos_lat`` and/or ``lon_rad``
+
+    Raises:
+        ValueError: If a coordinate is infinite or NaN
+    """
+    for value in (latitude, longitude):
+        if value is not None and not math.isfinite(value):
+            raise ValueError(f"Coordinate must be a finite number: {value}")
+
+    columns: Dict[str, float] = {}
+    if latitude is not None:
+        lat_rad = math.radians(latitude)
+        columns["lat_rad"] = lat_rad
+        columns["cos_lat"] = math.cos(lat_rad)
+    if longitude is not None:
+        columns["lon_rad"] = math.radians(longitude)
+    return columns
+
+
+def haversine_terms_rad(
+    lat1: float,
+    lon1: float,
+    lats_rad: np.ndarray,
+    lons_rad: np.ndarray,
+    cos_lats: np.ndarray,
+) -> np.ndarray:
+    """
+    Haversine terms ``a`` (before ``sqrt``/``asin``) to many points.
+
+    ``a`` increases with distance, so comparing it against
+    ``max_haversine_term`` or sorting by it gives the same result as using
+    the distances themselves.
+
+    Args:
+        lat1: Latitude of the origin in degrees
+        lon1: Longitude of the origin in degrees
+        lats_rad: Array of latitudes in radians
+        lons_rad: Array of longitudes in radians
+        cos_lats: Array of latitude cosines
+
+    Returns:
+        Array of haversine terms in [0, 1]
+    """
+    if haversine_terms_many is not None and len(lats_rad) >= NUMBA_MIN_POINTS:
+        out = np.empty(len(lats_rad))
+        haversine_terms_many(
+            float(lat1), float(lon1),
+            np.asarray(lats_rad, dtype=np.float64),
+            np.asarray(lons_rad, dtype=np.float64),
+            np.asarray(cos_lats, dtype=np.float64),
+            out,
+        )
+        return out
+
+    lat1_rad = math.radians(lat1)
+    d_lat = lats_rad - lat1_rad
+    d_lon = lons_rad - math.radians(lon1)
+
+    return np.sin(d_lat * 0.5) ** 2 + \
+        math.cos(lat1_rad) * cos_lats * np.sin(d_lon * 0.5) ** 2
+
+
+def max_haversine_term(distance_km: float) -> float:
+    """
+    Largest haversine term ``a`` of a point within ``distance_km``.
+
+    Args:
+        distance_km: Radius in kilometers
+
+    Returns:
+        ``sin(distance_km / 2R)**2``, or 1.0 once the radius covers the globe
+    """
+    half_angle = distance_km / (2.0 * EARTH_RADIUS_KM)
+    if half_angle >= math.pi / 2:
+        return 1.0
+    return math.sin(half_angle) ** 2
@@ -0,0 +1,31 @@
+"""
+Numba-compiled Haversine kernel for the nearby-address search
+"""
+import math
+
+from numba import njit, prange
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# An explicit signature compiles at import time (and cache=True reuses the
+# machine code across processes), so no request pays the JIT cost.
+@njit("void(float64, float64, float64[:], float64[:], float64[:], float64[:])",
+      parallel=True, fastmath=True, cache=True)
+def haversine_terms_many(lat0, lon0, lats_rad, lons_rad, cos_lats, out):
+    """
+    Write the haversine term ``a`` from (lat0, lon0) to each point into
+    ``out``, for callers that only compare or rank distances.
+
+    Points are given as precomputed latitude/longitude radians and
+    latitude cosines; the origin is in degrees.
+    """
+    lat0_rad = math.radians(lat0)
+    lon0_rad = math.radians(lon0)
+    cos_lat0 = math.cos(lat0_rad)
+    for i in prange(lats_rad.size):
+        half_d_lat = (lats_rad[i] - lat0_rad) * 0.5
+        half_d_lon = (lons_rad[i] - lon0_rad) * 0.5
+        out[i] = math.sin(half_d_lat) ** 2 + \
+            cos_lat0 * cos_lats[i] * math.sin(half_d_lon) ** 2
+
@@ -1,17 +1,39 @@
+import json
+import logging
+import math
+import threading
+from typing import List
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.db import get_db
 from app.db import Base
-from app.utils import parse_coordinate, haversine
+from app.db.migrations import run_migrations
+from app.schemas import AddressResponse
+from app.services.address_service import AddressService
+from app.utils import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    coordinate_columns,
+    haversine,
+    haversine_terms_rad,
+    max_haversine_term,
+    parse_coordinate,
+)
+from app.core.cache import response_cache
+from app.core.logging import FastRotatingFileHandler, JSONFormatter, setup_logging
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_addresses.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def override_get_db():
@@ -34,6 +56,35 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def sql_statements():
+    """Collect the SQL statements sent to the test database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+# Coordinates that parse but are not a valid location, as raw JSON values
+INVALID_COORDINATES = [
+    ('"inf"', '"75.84361"'),
+    ('Infinity', '75.84361'),
+    ('"nan"', '"75.84361"'),
+    ('NaN', '75.84361'),
+    ('"500"', '"75.84361"'),
+    ('"22.705435"', '"-181"'),
+]
+
+
+def raw_address(latitude: str, longitude: str, name: str = "Invalid") -> str:
+    """Build an address body from raw JSON values (allows Infinity/NaN)."""
+    return f'{{"name": "{name}", "latitude": {latitude}, "longitude": {longitude}}}'
+
+
 # ============== Utils Tests ==============
 
 class TestParseCoordinate:
@@ -72,6 +123,19 @@ class TestParseCoordinate:
         assert parse_coordinate("22.705435° n") == 22.705435
         assert parse_coordinate("22.705435° s") == -22.705435
 
+    def test_parse_string_is_memoized(self):
+        """Repeated strings hit the cache; invalid ones still raise every time."""
+        from app.utils import _parse_coord_str
+
+        parse_coordinate("12.345678° W")
+        hits = _parse_coord_str.cache_info().hits
+        assert parse_coordinate("12.345678° W") == -12.345678
+        assert _parse_coord_str.cache_info().hits == hits + 1
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                parse_coordinate("north-ish")
+
 
 class TestHaversine:
     """Tests for the haversine distance calculation function."""
@@ -100,6 +164,66 @@ class TestHaversine:
         assert 0.9 < distance < 1.1
 
 
+class TestHaversineVector:
+    """Tests for the vectorized haversine and bounding box helpers."""
+
+    def test_terms_match_scalar_haversine(self):
+        """Haversine terms convert to the distances of the scalar implementation."""
+        lats = np.array([22.7196, 23.2599, 22.7090])
+        lons = np.array([75.8577, 77.4126, 75.8400])
+        lats_rad = np.radians(lats)
+        terms = haversine_terms_rad(22.7000, 75.8400, lats_rad, np.radians(lons), np.cos(lats_rad))
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(terms))
+        for lat, lon, distance in zip(lats, lons, distances):
+            assert distance == pytest.approx(haversine(22.7000, 75.8400, lat, lon))
+
+    def test_numba_kernel_matches_numpy(self):
+        """The optional Numba kernel agrees with the NumPy implementation."""
+        pytest.importorskip("numba")
+        from app.utils._haversine_numba import haversine_terms_many
+
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(-80, 80, 1000)
+        lons = rng.uniform(-180, 180, 1000)
+        out = np.empty(1000)
+        lats_rad = np.radians(lats)
+        haversine_terms_many(22.7, 75.84, lats_rad, np.radians(lons), np.cos(lats_rad), out)
+        expected = haversine_terms_rad(22.7, 75.84, lats_rad[:10], np.radians(lons[:10]), np.cos(lats_rad[:10]))
+        assert out[:10] == pytest.approx(expected)
+
+    def test_haversine_term_threshold_matches_distance(self):
+        """Comparing haversine terms selects the same points as comparing distances."""
+        rng = np.random.default_rng(1)
+        lats = rng.uniform(-80, 80, 2000)
+        lons = rng.uniform(-180, 180, 2000)
+        lats_rad = np.radians(lats)
+        terms = haversine_terms_rad(22.7, 75.84, lats_rad, np.radians(lons), np.cos(lats_rad))
+        distances = np.array([haversine(22.7, 75.84, lat, lon) for lat, lon in zip(lats, lons)])
+        for radius in (500, 5000, 15000):
+            assert np.array_equal(terms <= max_haversine_term(radius), distances <= radius)
+        # A radius beyond the antipode covers everything
+        assert max_haversine_term(25000) == 1.0
+
+    @pytest.mark.parametrize("latitude, longitude", [
+        (math.inf, 75.84), (math.nan, 75.84), (22.7, -math.inf), (None, math.nan),
+    ])
+    def test_coordinate_columns_rejects_non_finite(self, latitude, longitude):
+        """Non-finite coordinates raise ValueError instead of a math domain error."""
+        with pytest.raises(ValueError, match="finite"):
+            coordinate_columns(latitude, longitude)
+
+    def test_bounding_box_contains_radius(self):
+        """Points on the search circle fall inside the bounding box."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(60.0, 10.0, 1000)
+        assert min_lat < 51.1 and max_lat > 68.9
+        # Meridians converge, so the widest point is north of the center
+        assert max_lon - 10.0 > 1000 / (111.195 * 0.5)
+
+    def test_bounding_box_near_pole_spans_all_longitudes(self):
+        """A circle reaching a pole covers every longitude."""
+        assert bounding_box(89.5, 0.0, 100)[2:] == (-180.0, 180.0)
+
+
 # ============== API Endpoint Tests ==============
 
 class TestCreateAddress:
@@ -115,8 +239,8 @@ class TestCreateAddress:
         assert response.status_code == 201
         data = response.json()
         assert data["name"] == "Test Location"
-        assert data["latitude"] == "22.705435"
-        assert data["longitude"] == "75.84361"
+        assert data["latitude"] == 22.705435
+        assert data["longitude"] == 75.84361
         assert "id" in data
 
     def test_create_address_with_degree_format(self):
@@ -129,6 +253,48 @@ class TestCreateAddress:
         assert response.status_code == 201
         data = response.json()
         assert data["name"] == "Indore Office"
+        assert data["latitude"] == 22.705435
+        assert data["longitude"] == 75.84361
+
+    def test_create_address_southern_western(self):
+        """S and W coordinates are stored as negative decimal degrees."""
+        response = client.post("/api/v1/addresses", json={
+            "name": "Rio",
+            "latitude": "22.9068° S",
+            "longitude": "43.1729° W"
+        })
+        assert response.status_code == 201
+        data = response.json()
+        assert data["latitude"] == -22.9068
+        assert data["longitude"] == -43.1729
+
+    def test_create_address_unknown_field(self):
+        """Unknown fields are rejected rather than silently ignored."""
+        response = client.post("/api/v1/addresses", json={
+            "name": "Home",
+            "latitude": "22.705435",
+            "longitude": "75.84361",
+            "altitude": "550"
+        })
+        assert response.status_code == 422
+
+    def test_create_address_invalid_coordinate(self):
+        """Unparseable coordinates are rejected by validation."""
+        response = client.post("/api/v1/addresses", json={
+            "name": "Nowhere",
+            "latitude": "north-ish",
+            "longitude": "75.84361"
+        })
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("latitude, longitude", INVALID_COORDINATES)
+    def test_create_address_non_finite_or_out_of_range(self, latitude, longitude):
+        """Infinite, NaN and out-of-range coordinates are rejected by validation."""
+        response = client.post(
+            "/api/v1/addresses", content=raw_address(latitude, longitude),
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
 
     def test_create_multiple_addresses(self):
         """Test creating multiple addresses."""
@@ -140,6 +306,58 @@ class TestCreateAddress:
             })
             assert response.status_code == 201
 
+    def test_bulk_create_addresses(self):
+        """Bulk creation returns every address in request order and indexes them."""
+        payload = [
+            {"name": f"Bulk {i}", "latitude": f"22.{700 + i}° N", "longitude": f"75.{840 + i}° E"}
+            for i in range(5)
+        ]
+        response = client.post("/api/v1/addresses/bulk", json=payload)
+        assert response.status_code == 201
+        data = response.json()
+        assert [address["name"] for address in data] == [f"Bulk {i}" for i in range(5)]
+        assert data[2]["latitude"] == 22.702
+        assert len({address["id"] for address in data}) == 5
+
+        # Derived columns and the spatial index are populated for bulk rows too
+        nearby = client.get("/api/v1/addresses/nearby", params={
+            "latitude": "22.702", "longitude": "75.842", "distance_km": 0.1
+        })
+        assert [address["name"] for address in nearby.json()] == ["Bulk 2"]
+
+    def test_bulk_create_rejects_invalid_item(self):
+        """One invalid address rejects the whole batch."""
+        response = client.post("/api/v1/addresses/bulk", json=[
+            {"name": "Good", "latitude": "22.7", "longitude": "75.8"},
+            {"name": "Bad", "latitude": "north-ish", "longitude": "75.8"},
+        ])
+        assert response.status_code == 422
+        assert client.get("/api/v1/addresses").json() == []
+
+    @pytest.mark.parametrize("latitude, longitude", INVALID_COORDINATES)
+    def test_bulk_create_rejects_non_finite_or_out_of_range(self, latitude, longitude):
+        """A non-finite or out-of-range coordinate rejects the whole batch."""
+        body = "[" + raw_address('"22.7"', '"75.8"', "Good") + ", " + raw_address(latitude, longitude) + "]"
+        response = client.post(
+            "/api/v1/addresses/bulk", content=body, headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert client.get("/api/v1/addresses").json() == []
+
+
+class TestDatabaseErrors:
+    """Tests for the application-level database error handler."""
+
+    def test_database_error_returns_500(self, monkeypatch):
+        """SQLAlchemy errors become a JSON 500 response."""
+        def fail(*args, **kwargs):
+            raise OperationalError("SELECT 1", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(AddressService, "get_all_addresses", fail)
+        response = client.get("/api/v1/addresses")
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Internal database error"}
+
 
 class TestUpdateAddress:
     """Tests for PUT /addresses/{id} endpoint."""
@@ -163,7 +381,7 @@ class TestUpdateAddress:
         assert response.status_code == 200
         data = response.json()
         assert data["name"] == "Updated Name"
-        assert data["latitude"] == "22.710000"
+        assert data["latitude"] == 22.71
 
     def test_update_nonexistent_address(self):
         """Test updating a non-existent address returns 404."""
@@ -175,6 +393,33 @@ class TestUpdateAddress:
         assert response.status_code == 404
         assert "not found" in response.json()["detail"]
 
+    @pytest.mark.parametrize("latitude, longitude", INVALID_COORDINATES)
+    def test_update_non_finite_or_out_of_range(self, latitude, longitude):
+        """Updates with invalid coordinates are rejected and change nothing."""
+        created = client.post("/api/v1/addresses", json={
+            "name": "Original", "latitude": "22.705435", "longitude": "75.84361"
+        }).json()
+        response = client.put(
+            f"/api/v1/addresses/{created['id']}", content=raw_address(latitude, longitude),
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert client.get(f"/api/v1/addresses/{created['id']}").json() == created
+
+    def test_update_with_empty_body_returns_address(self):
+        """An update with no fields leaves the address unchanged."""
+        create_response = client.post("/api/v1/addresses", json={
+            "name": "Unchanged",
+            "latitude": "22.705435",
+            "longitude": "75.84361"
+        })
+        address_id = create_response.json()["id"]
+
+        response = client.put(f"/api/v1/addresses/{address_id}", json={})
+        assert response.status_code == 200
+        assert response.json() == create_response.json()
+        assert client.put("/api/v1/addresses/9999", json={}).status_code == 404
+
 
 class TestDeleteAddress:
     """Tests for DELETE /addresses/{id} endpoint."""
@@ -272,3 +517,387 @@ class TestNearbyAddresses:
         })
         assert response.status_code == 200
         assert len(response.json()) == 3
+
+    def test_nearby_addresses_sorted_by_distance(self):
+        """Results are ordered nearest first."""
+        for name, lat in [("Far", "22.740"), ("Near", "22.701"), ("Middle", "22.720")]:
+            client.post("/api/v1/addresses", json={
+                "name": name,
+                "latitude": lat,
+                "longitude": "75.840"
+            })
+
+        response = client.get("/api/v1/addresses/nearby", params={
+            "latitude": 22.700,
+            "longitude": 75.840,
+            "distance_km": 10
+        })
+        assert response.status_code == 200
+        assert [a["name"] for a in response.json()] == ["Near", "Middle", "Far"]
+
+    def test_nearby_addresses_limit(self):
+        """limit returns only the nearest addresses, still in order."""
+        for i in range(10, 0, -1):
+            client.post("/api/v1/addresses", json={
+                "name": f"Point {i}",
+                "latitude": f"22.7{i:02d}",
+                "longitude": "75.840"
+            })
+
+        params = {"latitude": 22.700, "longitude": 75.840, "distance_km": 10}
+        response = client.get("/api/v1/addresses/nearby", params={**params, "limit": 3})
+        assert response.status_code == 200
+        assert [a["name"] for a in response.json()] == ["Point 1", "Point 2", "Point 3"]
+
+        response = client.get("/api/v1/addresses/nearby", params={**params, "limit": 50})
+        assert len(response.json()) == 10
+        assert client.get("/api/v1/addresses/nearby", params={**params, "limit": 0}).status_code == 422
+
+    def test_nearby_addresses_limit_with_ties(self):
+        """With equal distances, limit=N returns the first N of the unlimited result."""
+        client.post("/api/v1/addresses/bulk", json=[
+            {"name": f"Same {i}", "latitude": "22.705", "longitude": "75.845"}
+            for i in range(50)
+        ] + [{"name": "Closest", "latitude": "22.700", "longitude": "75.840"}])
+
+        params = {"latitude": 22.700, "longitude": 75.840, "distance_km": 10}
+        full = client.get("/api/v1/addresses/nearby", params=params).json()
+        assert full[0]["name"] == "Closest"
+        for limit in (1, 2, 3, 25, 50):
+            response = client.get("/api/v1/addresses/nearby", params={**params, "limit": limit})
+            assert response.json() == full[:limit]
+
+    def test_nearby_payload_matches_response_model(self):
+        """Both nearby query paths produce exactly the AddressResponse fields."""
+        created = client.post("/api/v1/addresses", json={
+            "name": "Indore Office", "latitude": "22.705435° N", "longitude": "75.84361° E"
+        }).json()
+        params = {"latitude": 22.705, "longitude": 75.843, "distance_km": 5}
+        payload = client.get("/api/v1/addresses/nearby", params=params).json()
+        assert TypeAdapter(List[AddressResponse]).validate_python(payload)
+        assert payload == [created]
+
+        # The server-database SQL path, run against SQLite
+        db = TestingSessionLocal()
+        try:
+            rows = AddressService._find_nearby_sql(
+                db, 22.705, 75.843, 5, bounding_box(22.705, 75.843, 5)
+            )
+        finally:
+            db.close()
+        assert [AddressResponse.model_validate(row).model_dump() for row in rows] == [created]
+
+    def test_nearby_addresses_follow_updates_and_deletes(self):
+        """The spatial prefilter reflects updated and deleted addresses."""
+        params = {"latitude": 22.700, "longitude": 75.840, "distance_km": 5}
+        moved = client.post("/api/v1/addresses", json={
+            "name": "Moved", "latitude": "22.705", "longitude": "75.844"
+        }).json()["id"]
+        deleted = client.post("/api/v1/addresses", json={
+            "name": "Deleted", "latitude": "22.702", "longitude": "75.841"
+        }).json()["id"]
+        client.post("/api/v1/addresses", json={
+            "name": "Arrived", "latitude": "23.500", "longitude": "76.500"
+        })
+        assert len(client.get("/api/v1/addresses/nearby", params=params).json()) == 2
+
+        client.put(f"/api/v1/addresses/{moved}", json={"latitude": "23.500", "longitude": "76.500"})
+        client.delete(f"/api/v1/addresses/{deleted}")
+        assert client.get("/api/v1/addresses/nearby", params=params).json() == []
+
+        far = {"latitude": 23.500, "longitude": 76.500, "distance_km": 1}
+        names = {a["name"] for a in client.get("/api/v1/addresses/nearby", params=far).json()}
+        assert names == {"Moved", "Arrived"}
+
+    def test_nearby_addresses_invalid_center(self):
+        """An out-of-range center point is rejected."""
+        response = client.get("/api/v1/addresses/nearby", params={
+            "latitude": 95.0,
+            "longitude": 75.840,
+            "distance_km": 5
+        })
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("distance_km", ["0", "-5", "nan"])
+    def test_nearby_addresses_invalid_distance(self, distance_km):
+        """A radius that is not a positive number is rejected."""
+        response = client.get("/api/v1/addresses/nearby", params={
+            "latitude": 22.700,
+            "longitude": 75.840,
+            "distance_km": distance_km
+        })
+        assert response.status_code == 400
+
+
+class TestResponseCache:
+    """Tests for the opt-in response cache and ETags on list endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch):
+        monkeypatch.setattr(response_cache, "max_entries", 64)
+        response_cache.invalidate()
+        yield
+        response_cache.invalidate()
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Without RESPONSE_CACHE_SIZE no ETag is sent."""
+        monkeypatch.setattr(response_cache, "max_entries", 0)
+        assert "etag" not in client.get("/api/v1/addresses").headers
+
+    def test_repeat_read_served_from_cache(self, sql_statements):
+        """A repeated read issues no query and a matching ETag gets 304."""
+        client.post("/api/v1/addresses", json={
+            "name": "Cached", "latitude": "22.7", "longitude": "75.84"
+        })
+        params = {"latitude": "22.7", "longitude": "75.84", "distance_km": 5}
+        first = client.get("/api/v1/addresses/nearby", params=params)
+        sql_statements.clear()
+
+        second = client.get("/api/v1/addresses/nearby", params=params)
+        assert second.json() == first.json() == [
+            {"id": 1, "name": "Cached", "latitude": 22.7, "longitude": 75.84}
+        ]
+        assert sql_statements == []
+
+        etag = first.headers["etag"]
+        not_modified = client.get(
+            "/api/v1/addresses/nearby", params=params, headers={"If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+    def test_invalid_params_not_revalidated(self):
+        """Invalid nearby parameters get 400 even with the current ETag."""
+        etag = client.get("/api/v1/addresses").headers["etag"]
+        response = client.get(
+            "/api/v1/addresses/nearby",
+            params={"latitude": "22.7", "longitude": "75.84", "distance_km": -5},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 400
+
+    def test_write_invalidates(self):
+        """Creating an address changes the ETag and the cached list."""
+        first = client.get("/api/v1/addresses")
+        assert first.json() == []
+
+        client.post("/api/v1/addresses", json={
+            "name": "New", "latitude": "22.7", "longitude": "75.84"
+        })
+        response = client.get("/api/v1/addresses", headers={"If-None-Match": first.headers["etag"]})
+        assert response.status_code == 200
+        assert response.headers["etag"] != first.headers["etag"]
+        assert [a["name"] for a in response.json()] == ["New"]
+
+
+class TestQueryCounts:
+    """Each endpoint issues a fixed number of queries, whatever the row count."""
+
+    @pytest.fixture(autouse=True)
+    def addresses(self):
+        for i in range(5):
+            client.post("/api/v1/addresses", json={
+                "name": f"Location {i}",
+                "latitude": f"22.{700 + i}",
+                "longitude": f"75.{840 + i}"
+            })
+
+    @pytest.mark.parametrize("method, path, params, expected", [
+        ("GET", "/api/v1/addresses", None, 1),
+        ("GET", "/api/v1/addresses/1", None, 1),
+        ("GET", "/api/v1/addresses/nearby",
+         {"latitude": "22.7", "longitude": "75.84", "distance_km": 50}, 1),
+        ("PUT", "/api/v1/addresses/1", {"name": "Renamed"}, 1),
+        ("DELETE", "/api/v1/addresses/1", None, 1),
+    ])
+    def test_query_count(self, sql_statements, method, path, params, expected):
+        """Reads and writes stay at one statement per request."""
+        if method == "PUT":
+            response = client.put(path, json=params)
+        else:
+            response = client.request(method, path, params=params)
+        assert response.status_code == 200
+        assert len(sql_statements) == expected, sql_statements
+
+    def test_strict_loading_reads(self, monkeypatch):
+        """Reads still work with lazy loading disabled."""
+        monkeypatch.setattr("app.services.address_service.settings.STRICT_LOADING", True)
+        assert client.get("/api/v1/addresses/1").status_code == 200
+        assert len(client.get("/api/v1/addresses").json()) == 5
+
+
+class TestBaseEndpoints:
+    """Tests for the root and health endpoints."""
+
+    def test_root(self):
+        """Root returns the welcome payload."""
+        response = client.get("/")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["message"] == "Welcome to Address Book API"
+
+    def test_health(self):
+        """Health check reports status, version and environment."""
+        response = client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert set(data) == {"status", "version", "environment"}
+
+
+class TestLoggingMiddleware:
+    """Tests for the request/response logging middleware."""
+
+    def test_process_time_header(self):
+        """Responses carry the X-Process-Time header."""
+        response = client.get("/")
+        assert response.status_code == 200
+        assert float(response.headers["x-process-time"]) >= 0
+
+
+class TestJSONFormatter:
+    """Tests for the structured JSON log formatter."""
+
+    def _record(self, **extra):
+        record = logging.LogRecord(
+            "app.test", logging.INFO, __file__, 42, 'Saved "%s"', ("Home",), None
+        )
+        record.__dict__.update(extra)
+        return record
+
+    def test_format_is_valid_json(self):
+        """Formatted records parse as JSON with the standard keys."""
+        data = json.loads(JSONFormatter().format(self._record()))
+        assert data["level"] == "INFO"
+        assert data["logger"] == "app.test"
+        assert data["message"] == 'Saved "Home"'
+        assert data["line"] == 42
+        assert "timestamp" in data
+
+    def test_timestamp_is_utc_iso8601(self):
+        """Timestamps come from the record's creation time, in UTC."""
+        formatter = JSONFormatter()
+        record = self._record(created=1705314645.123456)
+        assert json.loads(formatter.format(record))["timestamp"].startswith(
+            "2024-01-15T10:30:45.12345"
+        )
+        record = self._record(created=1705314646.5)
+        assert json.loads(formatter.format(record))["timestamp"] == "2024-01-15T10:30:46.500000Z"
+
+    def test_format_includes_extra_fields(self):
+        """Extra fields are merged into the JSON object."""
+        record = self._record(extra_fields={"method": "GET", "status_code": 200})
+        data = json.loads(JSONFormatter().format(record))
+        assert data["method"] == "GET"
+        assert data["status_code"] == 200
+
+
+class TestSetupLogging:
+    """Tests for logging configuration."""
+
+    def test_repeated_setup_does_not_duplicate_handlers(self):
+        """Calling setup_logging again replaces, rather than adds, handlers."""
+        setup_logging()
+        threads_before = threading.active_count()
+        setup_logging()
+        assert len(logging.getLogger().handlers) == 1
+        assert threading.active_count() == threads_before
+
+
+class TestFastRotatingFileHandler:
+    """Tests for the rotating file handler."""
+
+    def test_rolls_over_at_max_bytes(self, tmp_path):
+        """Log files are rotated once they reach maxBytes."""
+        log_file = tmp_path / "app.log"
+        handler = FastRotatingFileHandler(log_file, maxBytes=200, backupCount=2)
+        test_logger = logging.getLogger("tests.rotation")
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            for i in range(30):
+                test_logger.warning("message number %d", i)
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+
+        assert (tmp_path / "app.log.1").exists()
+        assert log_file.stat().st_size <= 200
+
+
+class TestMigrations:
+    """Tests for migrating existing databases."""
+
+    def test_string_coordinates_migrated_to_float(self, tmp_path):
+        """Legacy string coordinates are parsed into float columns."""
+        legacy_engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with legacy_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE addresses (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "latitude VARCHAR NOT NULL, longitude VARCHAR NOT NULL)"
+            ))
+            conn.execute(text("CREATE INDEX ix_addresses_id ON addresses (id)"))
+            conn.execute(text(
+                "INSERT INTO addresses VALUES "
+                "(1, 'Indore', '22.705435° N', '75.84361° E'), "
+                "(2, 'Rio', '22.9068° S', '43.1729° W'), "
+                "(3, 'Broken', 'unknown', '75.0'), "
+                "(4, 'Nowhere', '500', '75.0')"
+            ))
+
+        run_migrations(legacy_engine)
+        run_migrations(legacy_engine)  # idempotent
+
+        with legacy_engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT id, latitude, longitude FROM addresses ORDER BY id"
+            )).all()
+            indexed = conn.execute(text("SELECT count(*) FROM rtree_addresses")).scalar()
+            legacy_ids = conn.execute(text(
+                "SELECT id FROM addresses_legacy ORDER BY id"
+            )).scalars().all()
+        legacy_engine.dispose()
+        assert indexed == 2
+        # Rows that could not be migrated stay available in the legacy table
+        assert legacy_ids == [1, 2, 3, 4]
+        assert [tuple(row) for row in rows] == [
+            (1, 22.705435, 75.84361),
+            (2, -22.9068, -43.1729),
+        ]
+
+    def test_legacy_table_dropped_when_all_rows_migrate(self, tmp_path):
+        """The legacy copy is only removed once every row has migrated."""
+        legacy_engine = create_engine(f"sqlite:///{tmp_path / 'clean.db'}")
+        with legacy_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE addresses (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "latitude VARCHAR NOT NULL, longitude VARCHAR NOT NULL)"
+            ))
+            conn.execute(text("INSERT INTO addresses VALUES (1, 'Indore', '22.705435', '75.84361')"))
+
+        run_migrations(legacy_engine)
+
+        has_legacy = inspect(legacy_engine).has_table("addresses_legacy")
+        legacy_engine.dispose()
+        assert not has_legacy
+
+    def test_precomputed_columns_backfilled(self, tmp_path):
+        """Float-coordinate tables gain backfilled radian/cosine columns."""
+        legacy_engine = create_engine(f"sqlite:///{tmp_path / 'float.db'}")
+        with legacy_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE addresses (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "latitude FLOAT NOT NULL, longitude FLOAT NOT NULL)"
+            ))
+            conn.execute(text("INSERT INTO addresses VALUES (1, 'Indore', 22.705435, 75.84361)"))
+
+        run_migrations(legacy_engine)
+
+        with legacy_engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT lat_rad, lon_rad, cos_lat FROM addresses WHERE id = 1"
+            )).one()
+        legacy_engine.dispose()
+        assert row.lat_rad == pytest.approx(math.radians(22.705435))
+        assert row.lon_rad == pytest.approx(math.radians(75.84361))
+        assert row.cos_lat == pytest.approx(math.cos(math.radians(22.705435)))